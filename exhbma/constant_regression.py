@@ -8,7 +8,6 @@ from exhbma.linear_regression import LinearRegression
 from exhbma.probabilities import RandomVariable
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
 
 class ConstantRegression(object):
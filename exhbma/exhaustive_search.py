@@ -1,25 +1,33 @@
 import logging
 from enum import Enum, auto
-from itertools import product
-from typing import List, Tuple, Union
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from numpy.typing import DTypeLike
 from pydantic import BaseModel, Field
-from scipy.special import logsumexp
 from tqdm import tqdm
 
-from exhbma.constant_regression import MarginalConstantRegression
-from exhbma.linear_regression import LinearRegression, MarginalLinearRegression
+from exhbma.integrate import _log_area_in_square, _logsumexp
+from exhbma.linear_regression import LinearRegression
 from exhbma.probabilities import RandomVariable
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
+
+# Upper limit of array size in a batch of models fitted at once
+MAX_BATCH_ELEMENTS = 2 ** 22
+# Upper limit of array size in a block of models reduced at once
+MAX_REDUCTION_ELEMENTS = 2 ** 18
+# Number of batches per job dispatched to workers at once
+BATCHES_PER_JOB = 4
+# Number of set bits of each byte value
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
 
 
 class ModelInfo(BaseModel):
     indicator: List[int] = Field(
         ...,
-        description="Indicator vector of the model. This attribute may be excluded in the future, please use parent's `indicators_` instead.",  # noqa
+        description="Indicator vector of the model. This attribute may be excluded in the future, please use parent's `indicators_list` instead.",  # noqa
     )
     log_prior: float = Field(
         ...,
@@ -66,6 +74,30 @@ class ExhaustiveLinearRegression(object):
     exclude_null: bool (default: False)
         Whether or not exclude a null model.
 
+    n_jobs: Optional[int] (default: None)
+        Number of jobs to fit sub-models in parallel.
+        `None` means 1 and `-1` means using all processors.
+        Models with the same number of features are split into
+        at least `n_jobs` batches, which are fitted by one pool of workers.
+        See `joblib.Parallel` for details.
+
+    prune_threshold: Optional[float] (default: None)
+        If set, models are fitted in ascending order of the number of features,
+        and a model is skipped when an upper bound of its log-posterior
+        is lower than the best log-posterior found so far by more than this value.
+        Skipped models have `-inf` log-likelihood and zero coefficients.
+        Upper bound is derived from the full model and a parent model
+        which has one less feature.
+        This value should be non-negative,
+        and prediction with mode 'select' fails if the selected model is skipped.
+        By default, all models are fitted.
+
+    dtype: DTypeLike (default: np.float64)
+        Floating point type, np.float64 or np.float32, of log-likelihoods
+        over sigma and coefficients stored for all models.
+        np.float32 reduces memory of these buffers by half at the cost of precision,
+        while fitting and marginalization are calculated in float64.
+
     Attributes
     ----------
     n_features_in_: int
@@ -87,10 +119,13 @@ class ExhaustiveLinearRegression(object):
     feature_posteriors_: List[float]
         Posterior probabilities for each feature.
 
-    indicators_: List[List[int]]
-        List of indicator vectors.
+    indicators_: np.ndarray with shape (n_models,) and dtype np.uint64
+        Bit-packed indicator vectors.
+        i-th bit of each value represents whether i-th feature is in use,
+        and the value is equal to model index (+1 if null model is excluded).
         Null model `[0, 0, ..., 0]` are excluded,
         so length is :math:`2^{n\_features\_in\_} - 1`.
+        Use `indicators_list` to get indicator vectors as list.
 
     log_priors_: List[float]
         List of log-prior probabilities for each model specified by indicator.
@@ -102,6 +137,7 @@ class ExhaustiveLinearRegression(object):
         Information for all models specified by indicator vector.
         Length of this attribute is equal to that of indicators_
         and models correspond to each other.
+        This attribute is built from fitted results at the first access.
     """
 
     def __init__(
@@ -110,11 +146,18 @@ class ExhaustiveLinearRegression(object):
         sigma_coef_points: List[RandomVariable],
         alpha: float = 0.5,
         exclude_null: bool = False,
+        n_jobs: Optional[int] = None,
+        prune_threshold: Optional[float] = None,
+        dtype: DTypeLike = np.float64,
     ):
         self.sigma_noise_points = sigma_noise_points
         self.sigma_coef_points = sigma_coef_points
         self.alpha = alpha
         self.exclude_null = exclude_null
+        self.n_jobs = n_jobs
+        self.prune_threshold = prune_threshold
+        self.dtype = dtype
+        self._models: Optional[List[ModelInfo]] = None
         self._preprocessing_tolerance = 1e-8
 
     def fit(self, X: np.ndarray, y: np.ndarray, verbose: bool = True):
@@ -143,150 +186,423 @@ class ExhaustiveLinearRegression(object):
         LinearRegression.validate_feature_standardization(
             X=X, tolerance=self._preprocessing_tolerance
         )
+        dtype = np.dtype(self.dtype)
+        if dtype not in (np.float32, np.float64):
+            raise ValueError(
+                f"dtype should be either np.float32 or np.float64, received {dtype}"
+            )
+        if self.prune_threshold is not None and self.prune_threshold < 0:
+            raise ValueError(
+                "prune_threshold should be non-negative, "
+                f"received {self.prune_threshold}"
+            )
         self.n_features_in_: int = X.shape[1]
 
+        # Prior and axis points over (sigma_noise, sigma_coef) are shared by all models
+        self._log_sigma_prior: np.ndarray = np.add.outer(
+            np.log([p.prob for p in self.sigma_noise_points]),
+            np.log([p.prob for p in self.sigma_coef_points]),
+        )
+        self._sigma_noise_pos: List[float] = [
+            p.position for p in self.sigma_noise_points
+        ]
+        self._sigma_coef_pos: List[float] = [p.position for p in self.sigma_coef_points]
+
         # Perform exhaustive search
-        self.indicators_: List[List[int]] = self._generate_indicator(
+        self.indicators_: np.ndarray = self._generate_indicator(
             n_features=self.n_features_in_
         )
-        self.log_priors_: List[float] = []
-        self.log_likelihoods_: List[float] = []
-        self.models_: List[ModelInfo] = []
-        for indicator in tqdm(self.indicators_, disable=not verbose):
+        n_in_use = self._count_features_in_use(indicators=self.indicators_)
+        # Log-prior depends only on the number of features in use
+        log_prior_table = self._fixed_alpha_log_prior_table(
+            n_features=self.n_features_in_
+        )
+        np_log_priors = log_prior_table[n_in_use]
+        self.log_priors_: List[float] = np_log_priors.tolist()
+        # Gram matrix of sub-features is sliced from that of full features
+        XTX = np.dot(X.T, X)
+        XTy = np.dot(X.T, y)
+        yTy = np.dot(y, y)
+        var_y = np.var(y)
+        # Log-prior and integration area over sigma are shared by all models
+        log_sigma_weights = (
+            self._log_sigma_prior
+            + _log_area_in_square(x1=self._sigma_noise_pos, x2=self._sigma_coef_pos)
+            - np.log(4)
+        )
+
+        n_models = len(self.indicators_)
+        np_log_likelihoods = np.full(n_models, -np.inf)
+        self._log_likelihoods_over_sigma: np.ndarray = np.full(
+            (n_models,) + self._log_sigma_prior.shape, -np.inf, dtype=dtype
+        )
+        self._coefficients: np.ndarray = np.zeros(
+            (n_models, self.n_features_in_), dtype=dtype
+        )
+        if self.prune_threshold is not None:
+            # log det (sigma_noise**2 I + sigma_coef**2 X XT) of fitted models
+            # and its lower bound for pruned models
+            log_dets = np.empty((n_models,) + self._log_sigma_prior.shape)
             (
-                log_likelihood,
-                log_likelihood_over_sigma,
-                coefficient,
-            ) = self._fit_over_sigma_noise_and_coef(
-                X=X[:, np.array(indicator) == 1], y=y
+                full_log_likelihood_over_sigma,
+                _,
+                full_log_det,
+            ) = LinearRegression._fit_grid_from_gram(
+                XTX=XTX,
+                XTy=XTy,
+                yTy=yTy,
+                n_data=len(y),
+                var_y=var_y,
+                sigma_noise_arr=np.array(self._sigma_noise_pos),
+                sigma_coef_arr=np.array(self._sigma_coef_pos),
             )
-            self.log_priors_.append(self._fixed_alpha_prior(indicator=indicator))
-            self.log_likelihoods_.append(log_likelihood)
-            self.models_.append(
-                ModelInfo(
-                    indicator=indicator,
-                    log_prior=self.log_priors_[-1],
-                    coefficient=coefficient,
-                    log_likelihood_over_sigma=log_likelihood_over_sigma,
-                    log_likelihood=log_likelihood,
+            max_eigval = np.linalg.eigvalsh(XTX)[-1]
+        best_log_posterior = -np.inf
+
+        # Models are fitted in ascending order of the number of features in use,
+        # and models with the same number of features are fitted in batches.
+        # Each number of features is split into at least n_jobs batches,
+        # and a few batches per job are dispatched at once.
+        n_chunks = effective_n_jobs(self.n_jobs)
+        with tqdm(total=n_models, disable=not verbose) as pbar, Parallel(
+            n_jobs=self.n_jobs
+        ) as parallel:
+            for k in range(self.n_features_in_ + 1):
+                position = np.flatnonzero(n_in_use == k)
+                if self.prune_threshold is not None and k > 0:
+                    lower_log_det = self._log_det_lower_bound(
+                        indicators=self.indicators_[position],
+                        log_dets=log_dets,
+                        XTX_diag=np.diag(XTX),
+                        max_eigval=max_eigval,
+                        n_data=len(y),
+                    )
+                    # X XT of a model is smaller than that of the full model.
+                    upper_log_likelihood = _logsumexp(
+                        full_log_likelihood_over_sigma
+                        + (full_log_det - lower_log_det) / 2
+                        + log_sigma_weights,
+                        axis=(1, 2),
+                    )
+                    is_pruned = (
+                        log_prior_table[k] + upper_log_likelihood
+                        < best_log_posterior - self.prune_threshold
+                    )
+                    log_dets[position[is_pruned]] = lower_log_det[is_pruned]
+                    position = position[~is_pruned]
+                    pbar.update(is_pruned.sum())
+
+                batches = list(
+                    self._generate_batches(
+                        indicators=self.indicators_,
+                        position=position,
+                        n_in_use=k,
+                        n_chunks=n_chunks,
+                    )
                 )
-            )
+                n_dispatch = BATCHES_PER_JOB * n_chunks
+                for start in range(0, len(batches), n_dispatch):
+                    dispatched = batches[start : start + n_dispatch]
+                    tasks = (
+                        delayed(_fit_over_sigma_noise_and_coef)(
+                            XTX=XTX[idx[:, :, np.newaxis], idx[:, np.newaxis, :]],
+                            XTy=XTy[idx],
+                            yTy=yTy,
+                            n_data=len(y),
+                            var_y=var_y,
+                            log_sigma_weights=log_sigma_weights,
+                            sigma_noise_arr=np.array(self._sigma_noise_pos),
+                            sigma_coef_arr=np.array(self._sigma_coef_pos),
+                            dtype=dtype,
+                            return_log_det=self.prune_threshold is not None,
+                        )
+                        for _, idx in dispatched
+                    )
+                    if n_chunks == 1:
+                        # Results are consumed one by one to keep only a batch
+                        results: Iterable = (
+                            f(*args, **kwargs) for f, args, kwargs in tasks
+                        )
+                    else:
+                        results = parallel(tasks)
+                    for (batch_position, idx), result in zip(dispatched, results):
+                        (
+                            log_likelihood,
+                            log_likelihood_over_sigma,
+                            coefficient,
+                            log_det,
+                        ) = result
+                        np_log_likelihoods[batch_position] = log_likelihood
+                        self._log_likelihoods_over_sigma[
+                            batch_position
+                        ] = log_likelihood_over_sigma
+                        self._coefficients[
+                            batch_position[:, np.newaxis], idx
+                        ] = coefficient
+                        if self.prune_threshold is not None:
+                            log_dets[batch_position] = log_det
+                        best_log_posterior = max(
+                            best_log_posterior,
+                            (
+                                np_log_priors[batch_position]
+                                + np_log_likelihoods[batch_position]
+                            ).max(),
+                        )
+                        pbar.update(len(batch_position))
+        self.log_likelihoods_: List[float] = np_log_likelihoods.tolist()
+
+        # ModelInfo of each model is built only when `models_` is accessed
+        self._models = None
 
         # Marginalize the exhaustive search results
         self.log_likelihood_: float = self._calculate_log_marginal_likelihood(
-            log_priors=self.log_priors_, models=self.models_
+            log_priors=np_log_priors, log_likelihoods=np_log_likelihoods
         )
         self.feature_posteriors_: List[float] = self._calculate_feature_posterior(
-            log_priors=self.log_priors_,
+            log_priors=np_log_priors,
             indicators=self.indicators_,
-            models=self.models_,
+            log_likelihoods=np_log_likelihoods,
         )
         self.log_likelihood_over_sigma_: List[
             List[float]
         ] = self._calculate_log_marginal_likelihood_over_sigma(
-            log_priors=self.log_priors_, models=self.models_
+            log_priors=np_log_priors,
+            log_likelihoods_over_sigma=self._log_likelihoods_over_sigma,
         )
 
         coefficient = self._calculate_marginal_linear_model(
-            log_priors=self.log_priors_,
-            indicators=self.indicators_,
-            models=self.models_,
+            log_priors=np_log_priors,
+            log_likelihoods=np_log_likelihoods,
+            coefficients=self._coefficients,
         )
         self.coef_: List[float] = coefficient
 
-    def _fit_over_sigma_noise_and_coef(
-        self, X, y
-    ) -> Tuple[float, List[List[float]], List[float]]:
+    @property
+    def models_(self) -> List[ModelInfo]:
         """
-        Fit over (sigma_noise, sigma_coef) grid points and
-        calculate log model likelihood by marginalizing.
+        Information for all models, see the class docstring.
         """
-        model: Union[MarginalConstantRegression, MarginalLinearRegression] = (
-            MarginalLinearRegression(
-                sigma_noise_points=self.sigma_noise_points,
-                sigma_coef_points=self.sigma_coef_points,
-            )
-            if len(X[0]) > 0
-            else MarginalConstantRegression(
-                sigma_noise_points=self.sigma_noise_points,
-                sigma_coef_points=self.sigma_coef_points,
+        if self._models is None:
+            np_indicators = self._decode_indicators(
+                indicators=self.indicators_, n_features=self.n_features_in_
             )
+            self._models = [
+                ModelInfo(
+                    indicator=indicator.tolist(),
+                    log_prior=log_prior,
+                    coefficient=coefficient[indicator == 1].tolist(),
+                    log_likelihood_over_sigma=log_likelihood_over_sigma.tolist(),
+                    log_likelihood=log_likelihood,
+                )
+                for (
+                    indicator,
+                    log_prior,
+                    coefficient,
+                    log_likelihood_over_sigma,
+                    log_likelihood,
+                ) in zip(
+                    np_indicators,
+                    self.log_priors_,
+                    self._coefficients,
+                    self._log_likelihoods_over_sigma,
+                    self.log_likelihoods_,
+                )
+            ]
+        return self._models
+
+    def _generate_batches(
+        self,
+        indicators: np.ndarray,
+        position: np.ndarray,
+        n_in_use: int,
+        n_chunks: int = 1,
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Split models with the same number of features in use into batches.
+        Batch size is limited so that coefficients over sigma grid
+        contain at most `MAX_BATCH_ELEMENTS` elements,
+        and models are split into at least `n_chunks` batches if possible.
+
+        Parameters
+        ----------
+        indicators : np.ndarray with shape (n_models,) and dtype np.uint64
+            Bit-packed indicator vectors, which are decoded only for target models.
+
+        position : np.ndarray with shape (n_target_models,)
+            Index of models to be split.
+
+        n_in_use : int
+            Number of features in use of the target models.
+
+        n_chunks : int (default: 1)
+            Minimum number of batches, which is set to the number of parallel jobs.
+
+        Yields
+        ------
+        position : np.ndarray with shape (batch_size,)
+            Index of models in the batch.
+
+        idx : np.ndarray with shape (batch_size, n_in_use)
+            Index of features in use for each model in the batch.
+        """
+        n_sigma_points = len(self.sigma_noise_points) * len(self.sigma_coef_points)
+        np_indicators = self._decode_indicators(
+            indicators=indicators[position], n_features=self.n_features_in_
         )
-        model.fit(X=X, y=y, skip_preprocessing_validation=True)
+        idx = np.nonzero(np_indicators)[1].reshape(len(position), n_in_use)
+        batch_size = max(1, MAX_BATCH_ELEMENTS // (n_sigma_points * max(n_in_use, 1)))
+        batch_size = min(batch_size, max(1, -(-len(position) // n_chunks)))
+        for start in range(0, len(position), batch_size):
+            yield (
+                position[start : start + batch_size],
+                idx[start : start + batch_size],
+            )
 
-        return (
-            model.log_likelihood_,
-            model.log_likelihood_over_sigma_,
-            model.coef_,
+    def _log_det_lower_bound(
+        self,
+        indicators: np.ndarray,
+        log_dets: np.ndarray,
+        XTX_diag: np.ndarray,
+        max_eigval: float,
+        n_data: int,
+    ) -> np.ndarray:
+        """
+        Lower bound of log det (sigma_noise**2 I + sigma_coef**2 X XT) of models,
+        which is updated from that of parent models.
+        Parent model is given by removing the lowest feature in use, x,
+        and log det is updated by the rank-1 term sigma_coef**2 x xT as
+        log det C = log det C_parent + log(1 + sigma_coef**2 xT C_parent^-1 x),
+        where xT C_parent^-1 x >= xT x / (sigma_noise**2 + sigma_coef**2 max_eigval).
+
+        Parameters
+        ----------
+        indicators : np.ndarray with shape (n_target_models,) and dtype np.uint64
+            Bit-packed indicator vectors of models with at least one feature.
+
+        log_dets : np.ndarray with shape (n_models, n_sigma_noise, n_sigma_coef)
+            log det (or its lower bound) of all models.
+            Values for parent models should be already filled.
+
+        XTX_diag : np.ndarray with shape (n_features,)
+            Diagonal elements of Gram matrix, xT x of each feature.
+
+        max_eigval : float
+            Maximum eigenvalue of Gram matrix of full features,
+            which is not smaller than that of any parent model.
+
+        n_data : int
+            Number of data, which is used for excluded null model.
+        """
+        offset = 1 if self.exclude_null else 0
+        parents = indicators & (indicators - np.uint64(1))
+        lower_log_det = log_dets[
+            np.maximum(parents.astype(np.int64) - offset, 0)
+        ].copy()
+        sigma_noise_sq = np.array(self._sigma_noise_pos).reshape(-1, 1) ** 2
+        if self.exclude_null:
+            lower_log_det[parents == 0] = n_data * np.log(sigma_noise_sq)
+
+        lowest_feature = np.log2((indicators ^ parents).astype(float)).astype(int)
+        sigma_coef_sq = np.array(self._sigma_coef_pos) ** 2
+        lower_log_det += np.log1p(
+            XTX_diag[lowest_feature, np.newaxis, np.newaxis]
+            * sigma_coef_sq
+            / (sigma_noise_sq + sigma_coef_sq * max_eigval)
         )
+        return lower_log_det
 
     def _calculate_log_marginal_likelihood(
-        self, log_priors: List[float], models: List[ModelInfo]
+        self, log_priors: np.ndarray, log_likelihoods: np.ndarray
     ) -> float:
-        log_likelihood = logsumexp(
-            [p + m.log_likelihood for (p, m) in zip(log_priors, models)]
+        log_likelihood = _logsumexp(np.add(log_priors, log_likelihoods))
+        return float(log_likelihood)
+
+    def _calculate_model_posteriors(
+        self, log_priors: np.ndarray, log_likelihoods: np.ndarray
+    ) -> np.ndarray:
+        """
+        Posterior probability of each model, p(c| y, X).
+        Normalized by marginal likelihood, so all values are in [0, 1]
+        and averages over models are calculated by matrix product.
+        """
+        log_joint_probabilities = np.add(log_priors, log_likelihoods)
+        log_marginal_likelihood = self._calculate_log_marginal_likelihood(
+            log_priors=log_priors, log_likelihoods=log_likelihoods
         )
-        return log_likelihood
+        return np.exp(log_joint_probabilities - log_marginal_likelihood)
 
     def _calculate_feature_posterior(
         self,
-        log_priors: List[float],
-        indicators: List[List[int]],
-        models: List[ModelInfo],
+        log_priors: np.ndarray,
+        indicators: np.ndarray,
+        log_likelihoods: np.ndarray,
     ) -> List[float]:
-        log_joint_probabilities = [
-            p + m.log_likelihood for (p, m) in zip(log_priors, models)
-        ]
-        log_marginal_likelihood = self._calculate_log_marginal_likelihood(
-            log_priors=log_priors, models=models
+        model_posteriors = self._calculate_model_posteriors(
+            log_priors=log_priors, log_likelihoods=log_likelihoods
         )
-        np_indicators = np.array(indicators)
-        log_marginals = []
-        for column in range(np_indicators.shape[1]):
-            indicator_values = np_indicators[:, column]
-            log_marginals.append(
-                logsumexp(a=log_joint_probabilities, b=indicator_values)
-                - log_marginal_likelihood
+        # Posterior of each feature is summed over models with the bit set
+        return [
+            float(
+                model_posteriors[
+                    ((indicators >> np.uint64(i)) & np.uint64(1)) == 1
+                ].sum()
             )
-        return np.exp(log_marginals).tolist()
+            for i in range(self.n_features_in_)
+        ]
 
     def _calculate_log_marginal_likelihood_over_sigma(
-        self, log_priors: List[float], models: List[ModelInfo]
+        self, log_priors: np.ndarray, log_likelihoods_over_sigma: np.ndarray
     ) -> List[List[float]]:
-        log_likelihood_over_sigma = logsumexp(
-            [
-                np.array(m.log_likelihood_over_sigma) + p
-                for (m, p) in zip(models, log_priors)
-            ],
-            axis=0,
-        )
+        """
+        Parameters
+        ----------
+        log_priors : np.ndarray with shape (n_models,)
+            Log-prior for each model.
+
+        log_likelihoods_over_sigma : np.ndarray with shape (n_models, n_sn, n_sc)
+            Log-likelihood over sigma for each model.
+            n_sn and n_sc are numbers of sigma_noise and sigma_coef points.
+        """
+        # Models are reduced in blocks with running max and sum,
+        # so that only a block is cast up to float64 at once.
+        grid_shape = log_likelihoods_over_sigma.shape[1:]
+        block_size = max(1, MAX_REDUCTION_ELEMENTS // int(np.prod(grid_shape)))
+        running_max = np.full(grid_shape, -np.inf)
+        running_sum = np.zeros(grid_shape)
+        for start in range(0, len(log_priors), block_size):
+            block = log_likelihoods_over_sigma[start : start + block_size].astype(
+                np.float64
+            )
+            block += log_priors[start : start + block_size, np.newaxis, np.newaxis]
+            block_max = np.maximum(running_max, block.max(axis=0))
+            shift = np.where(np.isfinite(block_max), block_max, 0)
+            block -= shift
+            running_sum = running_sum * np.exp(running_max - shift) + np.exp(
+                block, out=block
+            ).sum(axis=0)
+            running_max = block_max
+        with np.errstate(divide="ignore"):
+            log_likelihood_over_sigma = np.log(running_sum) + np.where(
+                np.isfinite(running_max), running_max, 0
+            )
         return log_likelihood_over_sigma.tolist()
 
     def _calculate_marginal_linear_model(
         self,
-        log_priors: List[float],
-        indicators: List[List[int]],
-        models: List[ModelInfo],
+        log_priors: np.ndarray,
+        log_likelihoods: np.ndarray,
+        coefficients: np.ndarray,
     ) -> List[float]:
-        log_joint_probabilities = [
-            p + m.log_likelihood for (p, m) in zip(log_priors, models)
-        ]
-        log_marginal_likelihood = self._calculate_log_marginal_likelihood(
-            log_priors=log_priors, models=models
+        """
+        Parameters
+        ----------
+        coefficients : np.ndarray with shape (n_models, n_features)
+            Coefficients for each model, which are zero for features not in use.
+        """
+        model_posteriors = self._calculate_model_posteriors(
+            log_priors=log_priors, log_likelihoods=log_likelihoods
         )
-        np_coefficient = np.zeros((len(models), self.n_features_in_))
-        for i, (m, indicator) in enumerate(zip(models, indicators)):
-            np_coefficient[i, np.array(indicator) == 1] = m.coefficient
-
-        coefficient = []
-        for column in range(np_coefficient.shape[1]):
-            coefficient_values = np_coefficient[:, column]
-            result = logsumexp(
-                a=log_joint_probabilities, b=coefficient_values, return_sign=True
-            )
-            coefficient.append(result[1] * np.exp(result[0] - log_marginal_likelihood))
-
-        return coefficient
+        return np.dot(coefficients.T, model_posteriors).tolist()
 
     def _fixed_alpha_prior(self, indicator: List[int]) -> float:
         """
@@ -296,17 +612,38 @@ class ExhaustiveLinearRegression(object):
         Since we exclude null model, normalization constant is
         1 - (1 - alpha)^{n_features} .
         """
-        n_features = len(indicator)
-        n_in_use = sum(indicator)
-        log_model_prior = n_in_use * np.log(self.alpha) + (
+        log_prior_table = self._fixed_alpha_log_prior_table(n_features=len(indicator))
+        return float(log_prior_table[sum(indicator)])
+
+    def _fixed_alpha_log_prior_table(self, n_features: int) -> np.ndarray:
+        """
+        Table of log-prior with fixed alpha indexed by the number of features in use.
+        Prior with fixed alpha depends only on the number of features in use,
+        so log-priors of all models are gathered from this table.
+
+        Parameters
+        ----------
+        n_features : int
+            Number of features.
+
+        Returns
+        -------
+        log_prior_table : np.ndarray with shape (n_features + 1,)
+            Log-prior of a model which uses k features at k-th element.
+        """
+        n_in_use = np.arange(n_features + 1)
+        log_prior_table = n_in_use * np.log(self.alpha) + (
             n_features - n_in_use
         ) * np.log(1 - self.alpha)
         if self.exclude_null:
-            log_model_prior -= np.log(1 - (1 - self.alpha) ** n_features)
-        return log_model_prior
+            log_prior_table -= np.log(1 - (1 - self.alpha) ** n_features)
+        return log_prior_table
 
-    def _generate_indicator(self, n_features: int) -> List[List[int]]:
+    def _generate_indicator(self, n_features: int) -> np.ndarray:
         """
+        Indicator vectors are packed into bits of model index,
+        i-th element of indicator is i-th bit of the value.
+
         Parameters
         ----------
         n_features : int
@@ -317,13 +654,62 @@ class ExhaustiveLinearRegression(object):
 
         Returns
         -------
-        indicators : List with shape (n_combinations, n_features)
-            All combinations of indicator vector.
+        indicators : np.ndarray with shape (n_combinations,) and dtype np.uint64
+            All combinations of bit-packed indicator vector.
             n_combinations is 2**n_features - 1 because null model is excluded.
         """
         offset = 1 if self.exclude_null else 0
-        indicators = [list(p)[::-1] for p in product([0, 1], repeat=n_features)]
-        return indicators[offset:]
+        return np.arange(offset, 2 ** n_features, dtype=np.uint64)
+
+    @staticmethod
+    def _decode_indicators(indicators: np.ndarray, n_features: int) -> np.ndarray:
+        """
+        Decode bit-packed indicators into indicator vectors.
+
+        Parameters
+        ----------
+        indicators : np.ndarray with shape (n_models,) and dtype np.uint64
+            Bit-packed indicator vectors.
+
+        n_features : int
+            Number of features.
+
+        Returns
+        -------
+        indicators : np.ndarray with shape (n_models, n_features)
+            Indicator vectors of 0 or 1.
+        """
+        bits = np.arange(n_features, dtype=np.uint64)
+        return ((indicators[:, np.newaxis] >> bits) & np.uint64(1)).astype(int)
+
+    @staticmethod
+    def _count_features_in_use(indicators: np.ndarray) -> np.ndarray:
+        """
+        Count features in use by popcount of bit-packed indicators,
+        which is looked up for each byte of the values.
+
+        Parameters
+        ----------
+        indicators : np.ndarray with shape (n_models,) and dtype np.uint64
+            Bit-packed indicator vectors.
+
+        Returns
+        -------
+        n_in_use : np.ndarray with shape (n_models,)
+            Number of features in use for each model.
+        """
+        indicators = np.ascontiguousarray(indicators, dtype=np.uint64)
+        indicator_bytes = indicators.view(np.uint8).reshape(len(indicators), -1)
+        return _POPCOUNT_TABLE[indicator_bytes].sum(axis=1, dtype=np.int64)
+
+    @property
+    def indicators_list(self) -> List[List[int]]:
+        """
+        List of indicator vectors, which is materialized from `indicators_`.
+        """
+        return self._decode_indicators(
+            indicators=self.indicators_, n_features=self.n_features_in_
+        ).tolist()
 
     def _transform_indicator_to_model_index(self, indicator: List[int]) -> int:
         if len(indicator) != self.n_features_in_:
@@ -331,8 +717,9 @@ class ExhaustiveLinearRegression(object):
                 f"indicator should have be {self.n_features_in_}-length list"
             )
         offset = 1 if self.exclude_null else 0
-        bin_expr = "".join(map(str, indicator))[::-1]
-        return int(bin_expr, 2) - offset
+        # i-th element of indicator is i-th bit of the value
+        value = sum(int(c) << i for i, c in enumerate(indicator))
+        return value - offset
 
     def predict(self, X: np.ndarray, mode: str, threshold: float = 0.5) -> np.ndarray:
         """Predict using the model
@@ -372,10 +759,14 @@ class ExhaustiveLinearRegression(object):
 
     def _predict_by_select(self, X: np.ndarray, threshold: float = 0.5) -> np.ndarray:
         indicator = self.select_variables(threshold=threshold)
-        model = self.models_[
-            self._transform_indicator_to_model_index(indicator=indicator)
-        ]
-        pred = np.dot(X[:, np.array(indicator) == 1], model.coefficient)
+        model_index = self._transform_indicator_to_model_index(indicator=indicator)
+        if np.isneginf(self.log_likelihoods_[model_index]):
+            raise ValueError(
+                f"Selected model {indicator} was pruned in fit, "
+                "fit with larger prune_threshold or use mode 'full'"
+            )
+        coefficient = self._coefficients[model_index]
+        pred = np.dot(X, coefficient)
         return pred
 
     def _predict_by_full(self, X: np.ndarray) -> np.ndarray:
@@ -388,3 +779,84 @@ class ExhaustiveLinearRegression(object):
         """
         index = np.array(self.feature_posteriors_) >= threshold
         return index.astype(int).tolist()
+
+
+def _fit_over_sigma_noise_and_coef(
+    XTX: np.ndarray,
+    XTy: np.ndarray,
+    yTy: float,
+    n_data: int,
+    var_y: float,
+    log_sigma_weights: np.ndarray,
+    sigma_noise_arr: np.ndarray,
+    sigma_coef_arr: np.ndarray,
+    dtype: DTypeLike = np.float64,
+    return_log_det: bool = True,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Fit a batch of models over (sigma_noise, sigma_coef) grid points and
+    calculate log model likelihood by marginalizing.
+
+    All models in the batch and all grid points are evaluated by
+    a single vectorized calculation from Gram matrix of the features in use.
+    This is defined on module level so that batches can be fitted
+    in parallel processes.
+
+    Parameters
+    ----------
+    XTX : np.ndarray with shape (batch_size, n_in_use, n_in_use)
+        Gram matrix of features in use for each model.
+
+    XTy : np.ndarray with shape (batch_size, n_in_use)
+        X.T y of features in use for each model.
+
+    log_sigma_weights : np.ndarray with shape (n_sigma_noise, n_sigma_coef)
+        Log of prior times integration area for each grid point.
+
+    dtype : DTypeLike (default: np.float64)
+        Type of returned log_likelihood_over_sigma and coefficient.
+        Calculation itself is performed in float64.
+
+    return_log_det : bool (default: True)
+        Whether to return log_det, otherwise None is returned.
+
+    Returns
+    -------
+    log_likelihood : np.ndarray with shape (batch_size,)
+
+    log_likelihood_over_sigma : np.ndarray with shape
+        (batch_size, n_sigma_noise, n_sigma_coef)
+
+    coefficient : np.ndarray with shape (batch_size, n_in_use)
+
+    log_det : Optional[np.ndarray] with shape
+        (batch_size, n_sigma_noise, n_sigma_coef)
+        log det (sigma_noise**2 I + sigma_coef**2 X XT) of each model.
+    """
+    (
+        log_likelihood_over_sigma,
+        coefficients_over_sigma,
+        log_det,
+    ) = LinearRegression._fit_grid_from_gram(
+        XTX=XTX,
+        XTy=XTy,
+        yTy=yTy,
+        n_data=n_data,
+        var_y=var_y,
+        sigma_noise_arr=sigma_noise_arr,
+        sigma_coef_arr=sigma_coef_arr,
+    )
+    log_joint_probabilities = log_likelihood_over_sigma + log_sigma_weights
+    log_likelihood = _logsumexp(log_joint_probabilities, axis=(1, 2))
+
+    # Posterior weights over sigma grid are shared by all coefficients
+    sigma_posteriors = np.exp(
+        log_joint_probabilities - log_likelihood[:, np.newaxis, np.newaxis]
+    )
+    coefficient = np.einsum("bij,bijk->bk", sigma_posteriors, coefficients_over_sigma)
+    return (
+        log_likelihood,
+        log_likelihood_over_sigma.astype(dtype, copy=False),
+        coefficient.astype(dtype, copy=False),
+        log_det if return_log_det else None,
+    )
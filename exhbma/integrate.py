@@ -1,7 +1,7 @@
-from typing import List, Optional
+from typing import List, Literal, Optional, Tuple, Union, overload
 
 import numpy as np
-from scipy.special import logsumexp
+from numpy.typing import ArrayLike
 
 
 def integrate_log_values_in_square(
@@ -53,27 +53,34 @@ def integrate_log_values_in_square(
             )
 
     val = np_log_values - np.log(4)
+    val += _log_area_in_square(x1=x1, x2=x2)
 
+    result = _logsumexp(val, b=np_weights, return_sign=True)
+    if expect_positive:
+        if result[1] <= 0:
+            raise ValueError("Result is not positive.")
+        return result[0]
+    else:
+        """(log of calculation, sign)"""
+        return result
+
+
+def _log_area_in_square(x1: List[float], x2: List[float]) -> np.ndarray:
+    """
+    Log of (4 times) area assigned to each grid point in trapezoidal integration
+    over box region. Returned array has shape (len(x1), len(x2)).
+    """
     # For ease of implementation, extend axis points with edge values.
     extended_x1 = np.array([x1[0]] + x1 + [x1[-1]])
     extended_x2 = np.array([x2[0]] + x2 + [x2[-1]])
-    area = np.zeros_like(np_log_values, dtype=float)
+    area = np.zeros((len(x1), len(x2)), dtype=float)
     for i in range(2):
         for j in range(2):
             area += np.outer(
                 extended_x1[i + 1 : i + 1 + len(x1)] - extended_x1[i : i + len(x1)],
                 extended_x2[j + 1 : j + 1 + len(x2)] - extended_x2[j : j + len(x2)],
             )
-    val += np.log(area)
-
-    result = logsumexp(val, b=np_weights, return_sign=True)
-    if expect_positive:
-        if result[1] <= 0:
-            raise ValueError("Result is not positive.")
-        return result[0]
-    else:
-        """(log of calculation, sign)"""
-        return result
+    return np.log(area)
 
 
 def integrate_log_values_in_line(
@@ -127,7 +134,7 @@ def integrate_log_values_in_line(
         area += extended_x1[i + 1 : i + 1 + len(x1)] - extended_x1[i : i + len(x1)]
     val += np.log(area)
 
-    result = logsumexp(val, b=np_weights, return_sign=True)
+    result = _logsumexp(val, b=np_weights, return_sign=True)
     if expect_positive:
         if result[1] <= 0:
             raise ValueError("Result is not positive.")
@@ -146,3 +153,75 @@ def validate_list_dimension(x, dim: int, name: str):
         raise ValueError(
             "{} must be {}-dim list, received {}-dim".format(name, dim, len(np_x.shape))
         )
+
+
+@overload
+def _logsumexp(
+    a: ArrayLike,
+    axis: Optional[Union[int, Tuple[int, ...]]] = ...,
+    b: Optional[ArrayLike] = ...,
+    return_sign: Literal[False] = ...,
+) -> np.ndarray:
+    ...
+
+
+@overload
+def _logsumexp(
+    a: ArrayLike,
+    axis: Optional[Union[int, Tuple[int, ...]]] = ...,
+    b: Optional[ArrayLike] = ...,
+    *,
+    return_sign: Literal[True],
+) -> Tuple[np.ndarray, np.ndarray]:
+    ...
+
+
+def _logsumexp(
+    a: ArrayLike,
+    axis: Optional[Union[int, Tuple[int, ...]]] = None,
+    b: Optional[ArrayLike] = None,
+    return_sign: bool = False,
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Light-weight version of `scipy.special.logsumexp`.
+    log(sum(b * exp(a))) is calculated stably by shifting with max(a).
+
+    This function is called many times with small arrays in exhaustive search,
+    so input validation and array-API dispatch in scipy are skipped.
+
+    a: np.ndarray
+        Log values.
+
+    axis: Optional[Union[int, Tuple[int, ...]]], default: None
+        Axis or axes over which the sum is taken.
+        By default all elements are summed.
+
+    b: Optional[np.ndarray], default: None
+        Weights to exp(a). Negative values are allowed with `return_sign=True`.
+
+    return_sign: bool, default: False
+        If set True, (log of absolute value, sign) is returned.
+    """
+    np_a = np.asarray(a, dtype=float)
+    if b is not None:
+        np_a, np_b = np.broadcast_arrays(np_a, b)
+        if np.any(np_b == 0):
+            # Values with zero weight should not be used for shifting
+            np_a = np.where(np_b == 0, -np.inf, np_a)
+    a_max = np.max(np_a, axis=axis, keepdims=True)
+    a_max[~np.isfinite(a_max)] = 0
+
+    tmp = np.exp(np_a - a_max)
+    if b is not None:
+        tmp = tmp * np_b
+    s = np.sum(tmp, axis=axis)
+
+    if return_sign:
+        sign = np.sign(s)
+        s = np.abs(s)
+    with np.errstate(divide="ignore"):
+        out = np.log(s) + np.squeeze(a_max, axis=axis)
+
+    if return_sign:
+        return out, sign
+    return out
@@ -1,13 +1,12 @@
 import logging
-from typing import List
+from typing import List, Tuple
 
 import numpy as np
 
-from exhbma.integrate import integrate_log_values_in_square
+from exhbma.integrate import _log_area_in_square, integrate_log_values_in_square
 from exhbma.probabilities import RandomVariable
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
 
 class LinearRegression(object):
@@ -147,6 +146,126 @@ class LinearRegression(object):
         log_likelihood = const + log_det + log_exp + log_intercept
         return log_likelihood
 
+    @classmethod
+    def fit_grid(
+        cls,
+        X: np.ndarray,
+        y: np.ndarray,
+        sigma_noise_arr: np.ndarray,
+        sigma_coef_arr: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate coefficient and log likelihood for all combinations of
+        sigma_noise and sigma_coef at once.
+        Eigendecomposition of X.T X is shared over grid points,
+        X.T X = U np.diag(eigvals) U.T
+
+        Lambda = X.T X / sigma_noise**2 + I / sigma_coef**2
+        mu = Lambda**(-1) X.T y / sigma_noise**2
+           = U (np.diag(eigvals) + sigma_noise**2 / sigma_coef**2)**(-1) U.T X.T y
+
+        log det (sigma_noise**2 I + sigma_coef**2 X XT)
+        = N log(sigma_noise**2) + n_features log(sigma_coef**2)
+          + sum(log(eigvals / sigma_noise**2 + 1 / sigma_coef**2))
+        yT (sigma_noise**2 I + sigma_coef**2 X XT)**(-1) y
+        = (yT y - (U.T X.T y)**2 / (eigvals + sigma_noise**2 / sigma_coef**2))
+          / sigma_noise**2
+
+        Parameters
+        ----------
+        X : np.ndarray with shape (n_data, n_features)
+            Feature matrix. Each row corresponds to single data.
+
+        y : np.ndarray with shape  (n_data,)
+            Target value vector.
+
+        sigma_noise_arr: np.ndarray with shape (n_sigma_noise,)
+            Grid points of sigma_noise.
+
+        sigma_coef_arr: np.ndarray with shape (n_sigma_coef,)
+            Grid points of sigma_coef.
+
+        Returns
+        -------
+        log_likelihood_over_sigma: np.ndarray with shape (n_sigma_noise, n_sigma_coef)
+            Log likelihood for each grid point.
+
+        coef: np.ndarray with shape (n_sigma_noise, n_sigma_coef, n_features)
+            Coefficient for each grid point.
+        """
+        cls._validate_training_data_shape(X, y)
+        log_likelihood_over_sigma, coef, _ = cls._fit_grid_from_gram(
+            XTX=np.dot(X.T, X),
+            XTy=np.dot(X.T, y),
+            yTy=np.dot(y, y),
+            n_data=len(y),
+            var_y=np.var(y),
+            sigma_noise_arr=sigma_noise_arr,
+            sigma_coef_arr=sigma_coef_arr,
+        )
+        return log_likelihood_over_sigma, coef
+
+    @staticmethod
+    def _fit_grid_from_gram(
+        XTX: np.ndarray,
+        XTy: np.ndarray,
+        yTy: float,
+        n_data: int,
+        var_y: float,
+        sigma_noise_arr: np.ndarray,
+        sigma_coef_arr: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Same calculation as `fit_grid`, but only reduced quantities of data
+        (X.T X, X.T y, y.T y) are used.
+        Gram matrix of sub-features can be sliced from that of full features,
+        so data matrix is not necessary.
+
+        Leading dimensions of XTX (..., n_features, n_features) and
+        XTy (..., n_features) are treated as a batch of models
+        sharing the same number of features,
+        then results have shapes (..., n_sigma_noise, n_sigma_coef) and
+        (..., n_sigma_noise, n_sigma_coef, n_features).
+
+        log det (sigma_noise**2 I + sigma_coef**2 X XT) with shape
+        (..., n_sigma_noise, n_sigma_coef) is also returned as the last element.
+        """
+        n_features = XTX.shape[-1]
+
+        eigvals, eigvecs = np.linalg.eigh(XTX)
+        UTXTy = np.einsum("...ji,...j->...i", eigvecs, XTy)
+
+        sigma_noise2 = np.asarray(sigma_noise_arr, dtype=float).reshape(-1, 1) ** 2
+        sigma_coef2 = np.asarray(sigma_coef_arr, dtype=float).reshape(1, -1) ** 2
+
+        # Shape: (..., n_sigma_noise, n_sigma_coef, n_features)
+        eigvals = eigvals[..., np.newaxis, np.newaxis, :]
+        UTXTy = UTXTy[..., np.newaxis, np.newaxis, :]
+        eigvals_lambda = eigvals + (sigma_noise2 / sigma_coef2)[:, :, np.newaxis]
+        coef = np.matmul(
+            UTXTy / eigvals_lambda,
+            np.swapaxes(eigvecs, -1, -2)[..., np.newaxis, :, :],
+        )
+
+        log_det_cov = (
+            n_data * np.log(sigma_noise2)
+            + n_features * np.log(sigma_coef2)
+            + np.log(
+                eigvals / sigma_noise2[:, :, np.newaxis]
+                + 1 / sigma_coef2[:, :, np.newaxis]
+            ).sum(axis=-1)
+        )
+        quad_cov = (yTy - (UTXTy ** 2 / eigvals_lambda).sum(axis=-1)) / sigma_noise2
+
+        const = -n_data / 2 * np.log(2 * np.pi)
+        log_det = -1 / 2 * log_det_cov
+        log_exp = -1 / 2 * quad_cov
+        log_intercept = (
+            np.log(sigma_noise2) - np.log(n_data * var_y + sigma_noise2)
+        ) / 2
+        log_likelihood_over_sigma = const + log_det + log_exp + log_intercept
+        return log_likelihood_over_sigma, coef, log_det_cov
+
     @staticmethod
     def _validate_training_data_shape(X, y):
         """
@@ -305,16 +424,11 @@ class MarginalLinearRegression(object):
         )
 
         # Integrate coefficient by log_prob_values
-        coefficient = []
-        for i in range(X.shape[1]):
-            coefficient.append(
-                self._integrate_coefficient_over_sigma(
-                    index=i,
-                    fit_models=fit_models,
-                    log_joint_probabilities=log_joint_probabilities,
-                    log_likelihood=log_likelihood,
-                )
-            )
+        coefficient = self._integrate_coefficients_over_sigma(
+            fit_models=fit_models,
+            log_joint_probabilities=log_joint_probabilities,
+            log_likelihood=log_likelihood,
+        )
 
         self.log_likelihood_ = log_likelihood
         self.log_likelihood_over_sigma_ = log_likelihood_over_sigma.tolist()
@@ -350,25 +464,30 @@ class MarginalLinearRegression(object):
         )
         return log_likelihood
 
-    def _integrate_coefficient_over_sigma(
+    def _integrate_coefficients_over_sigma(
         self,
-        index: int,
         fit_models: List[List[LinearRegression]],
         log_joint_probabilities,
         log_likelihood: float,
-    ) -> float:
-        coefficient_weights = [
-            [model.coef_[index] for model in models_along_coef]
-            for models_along_coef in fit_models
-        ]
-        result = integrate_log_values_in_square(
-            log_values=(log_joint_probabilities - log_likelihood).tolist(),
+    ) -> List[float]:
+        """
+        Posterior weights over sigma grid, including trapezoidal integration area,
+        are shared by all coefficients, so all of them are integrated at once.
+        """
+        coefficients_over_sigma = np.array(
+            [
+                [model.coef_ for model in models_along_coef]
+                for models_along_coef in fit_models
+            ]
+        )
+        log_area = _log_area_in_square(
             x1=[p.position for p in self.sigma_noise_points],
             x2=[p.position for p in self.sigma_coef_points],
-            weights=coefficient_weights,
-            expect_positive=False,
         )
-        return result[1] * np.exp(result[0])
+        sigma_posteriors = np.exp(
+            log_joint_probabilities - log_likelihood + log_area - np.log(4)
+        )
+        return np.tensordot(sigma_posteriors, coefficients_over_sigma, axes=2).tolist()
 
     def predict(self, X):
         """
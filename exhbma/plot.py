@@ -99,12 +99,12 @@ def weight_diagram(
         A trained ExhaustiveLinearRegression model.
     """
 
-    coefs = np.zeros_like(model.indicators_, dtype=float)
-    for i in range(len(model.models_)):
-        coefs[i, np.array(model.indicators_[i]) == 1] = np.array(
-            model.models_[i].coefficient
-        )
-    mcoefs = np.ma.masked_where(np.array(model.indicators_) == 0, coefs)
+    indicators = model._decode_indicators(
+        indicators=model.indicators_, n_features=model.n_features_in_
+    )
+    # Coefficients of features not in use are zero in the fitted buffer
+    coefs = model._coefficients
+    mcoefs = np.ma.masked_where(indicators == 0, coefs)
 
     if figsize is None:
         figsize = (24, model.n_features_in_)
@@ -2,8 +2,15 @@ from typing import List
 
 import numpy as np
 import pytest
+from joblib import parallel_backend
+from scipy.special import logsumexp
 
-from exhbma import ExhaustiveLinearRegression, StandardScaler, inverse
+from exhbma import (
+    ExhaustiveLinearRegression,
+    StandardScaler,
+    exhaustive_search,
+    inverse,
+)
 
 
 @pytest.fixture()
@@ -16,6 +23,8 @@ def seed():
 def check_basic_attribute_after_fit(model: ExhaustiveLinearRegression, n_features: int):
     assert model.n_features_in_ == n_features
     assert len(model.indicators_) == 2 ** n_features
+    assert len(model.indicators_list) == 2 ** n_features
+    assert all(len(indicator) == n_features for indicator in model.indicators_list)
 
 
 def check_feature_posteriors(
@@ -170,6 +179,8 @@ def test_generate_indicator():
     )
     n_features = 3
     indicators = reg._generate_indicator(n_features=n_features)
+    assert indicators.dtype == np.uint64
+    assert indicators.tolist() == list(range(8))
     expect = [
         [0, 0, 0],
         [1, 0, 0],
@@ -180,7 +191,10 @@ def test_generate_indicator():
         [0, 1, 1],
         [1, 1, 1],
     ]
-    assert indicators == expect
+    assert (
+        reg._decode_indicators(indicators=indicators, n_features=n_features).tolist()
+        == expect
+    )
 
 
 def test_generate_indicator_excluding_null():
@@ -192,6 +206,8 @@ def test_generate_indicator_excluding_null():
     )
     n_features = 3
     indicators = reg._generate_indicator(n_features=n_features)
+    assert indicators.dtype == np.uint64
+    assert indicators.tolist() == list(range(1, 8))
     expect = [
         [1, 0, 0],
         [0, 1, 0],
@@ -201,7 +217,10 @@ def test_generate_indicator_excluding_null():
         [0, 1, 1],
         [1, 1, 1],
     ]
-    assert indicators == expect
+    assert (
+        reg._decode_indicators(indicators=indicators, n_features=n_features).tolist()
+        == expect
+    )
 
 
 def test_fixed_alpha_prior_include_null():
@@ -275,3 +294,425 @@ def test_fixed_alpha_prior_not_half():
     probs = [0.008, 0.032, 0.032, 0.128, 0.032, 0.128, 0.128, 0.512]
     for indicator, p in zip(indicators, probs):
         assert reg._fixed_alpha_prior(indicator=indicator) == pytest.approx(np.log(p))
+
+
+def test_fixed_alpha_log_prior_table():
+    """
+    Test method `_fixed_alpha_log_prior_table` against `_fixed_alpha_prior`.
+    """
+    reg = ExhaustiveLinearRegression(
+        sigma_noise_points=[], sigma_coef_points=[], alpha=0.8, exclude_null=True
+    )
+    n_features = 4
+    indicators = reg._decode_indicators(
+        indicators=reg._generate_indicator(n_features=n_features),
+        n_features=n_features,
+    ).tolist()
+    log_priors = reg._fixed_alpha_log_prior_table(n_features=n_features)[
+        np.sum(indicators, axis=1)
+    ]
+    assert log_priors.tolist() == pytest.approx(
+        [reg._fixed_alpha_prior(indicator=indicator) for indicator in indicators]
+    )
+    assert np.exp(log_priors).sum() == pytest.approx(1)
+
+
+def test_exhaustive_linear_regression_in_parallel(seed):
+    """
+    Test method `fit` with n_jobs gives the same result as sequential one.
+    """
+    n_data, n_features = 50, 4
+    X = np.random.randn(n_data, n_features)
+    y = np.dot(X, [1, 0.5, 0, 0]) + np.random.randn(n_data) * 0.1
+
+    x_scaler = StandardScaler(n_dim=2)
+    y_scaler = StandardScaler(n_dim=1, scaling=False)
+    x_scaler.fit(X)
+    y_scaler.fit(y)
+    X = x_scaler.transform(X)
+    y = y_scaler.transform(y)
+
+    models = []
+    for n_jobs in [None, 2]:
+        reg = ExhaustiveLinearRegression(
+            sigma_noise_points=inverse(np.logspace(-2, 0, 5)),
+            sigma_coef_points=inverse(np.logspace(-1, 1, 5)),
+            n_jobs=n_jobs,
+        )
+        reg.fit(X, y, verbose=False)
+        models.append(reg)
+
+    assert models[1].log_likelihoods_ == pytest.approx(models[0].log_likelihoods_)
+    assert models[1].coef_ == pytest.approx(models[0].coef_)
+    assert models[1].feature_posteriors_ == pytest.approx(models[0].feature_posteriors_)
+
+
+def test_exhaustive_linear_regression_split_for_parallel(seed, monkeypatch):
+    """
+    Test method `fit` with n_jobs splits models with the same number of features
+    into at least n_jobs batches.
+    """
+    n_data, n_features, n_jobs = 50, 4, 2
+    X = np.random.randn(n_data, n_features)
+    y = np.dot(X, [1, 0.5, 0, 0]) + np.random.randn(n_data) * 0.1
+
+    x_scaler = StandardScaler(n_dim=2)
+    y_scaler = StandardScaler(n_dim=1, scaling=False)
+    x_scaler.fit(X)
+    y_scaler.fit(y)
+    X = x_scaler.transform(X)
+    y = y_scaler.transform(y)
+
+    batch_sizes: List[int] = []
+    fit_batch = exhaustive_search._fit_over_sigma_noise_and_coef
+
+    def fit_batch_with_record(**kwargs):
+        batch_sizes.append(len(kwargs["XTy"]))
+        return fit_batch(**kwargs)
+
+    monkeypatch.setattr(
+        exhaustive_search, "_fit_over_sigma_noise_and_coef", fit_batch_with_record
+    )
+    reg = ExhaustiveLinearRegression(
+        sigma_noise_points=inverse(np.logspace(-2, 0, 5)),
+        sigma_coef_points=inverse(np.logspace(-1, 1, 5)),
+        n_jobs=n_jobs,
+    )
+    # Threads are used so that batches are recorded in this process
+    with parallel_backend("threading", n_jobs=n_jobs):
+        reg.fit(X, y, verbose=False)
+
+    # Numbers of models with 0, ..., 4 features are 1, 4, 6, 4, 1
+    assert sorted(batch_sizes) == [1, 1, 2, 2, 2, 2, 3, 3]
+    assert np.all(np.isfinite(reg.log_likelihoods_))
+
+
+@pytest.mark.parametrize("prune_threshold", [None, 5.0])
+def test_exhaustive_linear_regression_progress(seed, monkeypatch, prune_threshold):
+    """
+    Test method `fit` updates progress bar for each batch and pruned models.
+    """
+    n_data, n_features = 50, 6
+    X = np.random.randn(n_data, n_features)
+    y = np.dot(X[:, :2], [1, 0.5]) + np.random.randn(n_data) * 0.1
+
+    x_scaler = StandardScaler(n_dim=2)
+    y_scaler = StandardScaler(n_dim=1, scaling=False)
+    x_scaler.fit(X)
+    y_scaler.fit(y)
+    X = x_scaler.transform(X)
+    y = y_scaler.transform(y)
+
+    updates: List[int] = []
+    monkeypatch.setattr(
+        exhaustive_search.tqdm, "update", lambda self, n=1: updates.append(n)
+    )
+    reg = ExhaustiveLinearRegression(
+        sigma_noise_points=inverse(np.logspace(-2, 0, 5)),
+        sigma_coef_points=inverse(np.logspace(-1, 1, 5)),
+        prune_threshold=prune_threshold,
+    )
+    reg.fit(X, y, verbose=False)
+
+    assert len(updates) > n_features
+    assert sum(updates) == 2 ** n_features
+
+
+@pytest.mark.parametrize("exclude_null", [False, True])
+def test_exhaustive_linear_regression_with_pruning(seed, exclude_null: bool):
+    """
+    Test method `fit` with prune_threshold.
+    Pruned models should have log-posterior lower than the maximum
+    by more than threshold, and other models should be unchanged.
+    """
+    n_data, n_features = 60, 8
+    prune_threshold = 5.0
+    X = np.random.randn(n_data, n_features)
+    y = np.dot(X[:, [0, 3]], [1, -0.7]) + np.random.randn(n_data) * 0.1
+
+    x_scaler = StandardScaler(n_dim=2)
+    y_scaler = StandardScaler(n_dim=1, scaling=False)
+    x_scaler.fit(X)
+    y_scaler.fit(y)
+    X = x_scaler.transform(X)
+    y = y_scaler.transform(y)
+
+    models = []
+    for threshold in [None, prune_threshold]:
+        reg = ExhaustiveLinearRegression(
+            sigma_noise_points=inverse(np.logspace(-2, 0, 10)),
+            sigma_coef_points=inverse(np.logspace(-1, 1, 10)),
+            exclude_null=exclude_null,
+            prune_threshold=threshold,
+        )
+        reg.fit(X, y, verbose=False)
+        models.append(reg)
+
+    log_posteriors = np.array(models[0].log_likelihoods_) + models[0].log_priors_
+    is_pruned = np.isinf(models[1].log_likelihoods_)
+    assert is_pruned.sum() > 0
+    assert np.all(log_posteriors[is_pruned] < log_posteriors.max() - prune_threshold)
+    assert np.array(models[1].log_likelihoods_)[~is_pruned] == pytest.approx(
+        np.array(models[0].log_likelihoods_)[~is_pruned]
+    )
+    assert models[1].coef_ == pytest.approx(models[0].coef_, abs=1e-3)
+    assert models[1].feature_posteriors_ == pytest.approx(
+        models[0].feature_posteriors_, abs=1e-3
+    )
+
+
+def test_log_det_lower_bound(seed):
+    """
+    Test method `_log_det_lower_bound`.
+    The bound updated from exact log det of parent models should be
+    not less than log det of parent models and not greater than the exact one.
+    """
+    n_data, n_features = 30, 5
+    X = np.random.randn(n_data, n_features)
+    x_scaler = StandardScaler(n_dim=2)
+    x_scaler.fit(X)
+    X = x_scaler.transform(X)
+
+    reg = ExhaustiveLinearRegression(
+        sigma_noise_points=inverse(np.logspace(-2, 0, 5)),
+        sigma_coef_points=inverse(np.logspace(-1, 1, 5)),
+    )
+    reg._sigma_noise_pos = [p.position for p in reg.sigma_noise_points]
+    reg._sigma_coef_pos = [p.position for p in reg.sigma_coef_points]
+    indicators = reg._generate_indicator(n_features=n_features)
+
+    sigma_noise = np.array(reg._sigma_noise_pos).reshape(-1, 1, 1)
+    sigma_coef = np.array(reg._sigma_coef_pos).reshape(1, -1, 1)
+    log_dets_list = []
+    for indicator in reg._decode_indicators(indicators, n_features=n_features):
+        x = X[:, indicator == 1]
+        eigvals = np.concatenate(
+            [np.linalg.eigvalsh(np.dot(x.T, x)), np.zeros(n_data - x.shape[1])]
+        )
+        log_dets_list.append(
+            np.log(sigma_noise ** 2 + sigma_coef ** 2 * eigvals).sum(-1)
+        )
+    log_dets = np.array(log_dets_list)
+
+    XTX = np.dot(X.T, X)
+    lower_log_det = reg._log_det_lower_bound(
+        indicators=indicators[1:],
+        log_dets=log_dets,
+        XTX_diag=np.diag(XTX),
+        max_eigval=np.linalg.eigvalsh(XTX)[-1],
+        n_data=n_data,
+    )
+    parents = (indicators[1:] & (indicators[1:] - np.uint64(1))).astype(int)
+    assert np.all(lower_log_det > log_dets[parents])
+    assert np.all(lower_log_det <= log_dets[1:] + 1e-8)
+
+
+def test_models_built_at_first_access(seed):
+    """
+    Test property `models_`, which is built from fitted results
+    at the first access and reused after that.
+    """
+    n_data, n_features = 20, 3
+    X = np.random.randn(n_data, n_features)
+    y = X[:, 0] + np.random.randn(n_data) * 0.1
+
+    x_scaler = StandardScaler(n_dim=2)
+    y_scaler = StandardScaler(n_dim=1, scaling=False)
+    x_scaler.fit(X)
+    y_scaler.fit(y)
+    X = x_scaler.transform(X)
+    y = y_scaler.transform(y)
+
+    reg = ExhaustiveLinearRegression(
+        sigma_noise_points=inverse(np.logspace(-2, 0, 5)),
+        sigma_coef_points=inverse(np.logspace(-1, 1, 5)),
+    )
+    reg.fit(X, y, verbose=False)
+    assert reg._models is None
+
+    models = reg.models_
+    assert reg.models_ is models
+    assert [m.indicator for m in models] == reg.indicators_list
+    assert [m.log_prior for m in models] == reg.log_priors_
+    assert [m.log_likelihood for m in models] == reg.log_likelihoods_
+    for m, indicator in zip(models, reg.indicators_list):
+        assert len(m.coefficient) == sum(indicator)
+
+
+def test_count_features_in_use():
+    """
+    Test method `_count_features_in_use` against sum of decoded indicators.
+    """
+    n_features = 10
+    indicators = np.concatenate(
+        [
+            np.arange(2 ** n_features, dtype=np.uint64),
+            np.array([2 ** 63 - 1, 2 ** 64 - 1], dtype=np.uint64),
+        ]
+    )
+    n_in_use = ExhaustiveLinearRegression._count_features_in_use(indicators)
+    expect = ExhaustiveLinearRegression._decode_indicators(
+        indicators=indicators, n_features=64
+    ).sum(axis=1)
+    assert np.all(n_in_use == expect)
+
+
+@pytest.mark.parametrize("exclude_null", [False, True])
+def test_transform_indicator_to_model_index(exclude_null: bool):
+    """
+    Test method `_transform_indicator_to_model_index`,
+    which should return position of the indicator in `indicators_`.
+    """
+    n_features = 4
+    reg = ExhaustiveLinearRegression(
+        sigma_noise_points=inverse(np.logspace(-2, 0, 5)),
+        sigma_coef_points=inverse(np.logspace(-1, 1, 5)),
+        exclude_null=exclude_null,
+    )
+    reg.n_features_in_ = n_features
+    reg.indicators_ = reg._generate_indicator(n_features=n_features)
+    for i, indicator in enumerate(reg.indicators_list):
+        assert reg._transform_indicator_to_model_index(indicator=indicator) == i
+
+    with pytest.raises(ValueError, match="indicator should have be 4-length list"):
+        reg._transform_indicator_to_model_index(indicator=[1, 0, 1])
+
+
+def test_exhaustive_linear_regression_with_float32(seed):
+    """
+    Test method `fit` with float32 buffers.
+    Results should be close to those with float64 buffers.
+    """
+    n_data, n_features = 30, 5
+    X = np.random.randn(n_data, n_features)
+    y = np.dot(X[:, [0, 2]], [1, -0.5]) + np.random.randn(n_data) * 0.1
+
+    x_scaler = StandardScaler(n_dim=2)
+    y_scaler = StandardScaler(n_dim=1, scaling=False)
+    x_scaler.fit(X)
+    y_scaler.fit(y)
+    X = x_scaler.transform(X)
+    y = y_scaler.transform(y)
+
+    models = []
+    for dtype in [np.float64, np.float32]:
+        reg = ExhaustiveLinearRegression(
+            sigma_noise_points=inverse(np.logspace(-2, 0, 5)),
+            sigma_coef_points=inverse(np.logspace(-1, 1, 5)),
+            dtype=dtype,
+        )
+        reg.fit(X, y, verbose=False)
+        models.append(reg)
+
+    assert models[1]._log_likelihoods_over_sigma.dtype == np.float32
+    assert models[1]._coefficients.dtype == np.float32
+    assert models[1].log_likelihood_ == pytest.approx(models[0].log_likelihood_)
+    assert np.array(models[1].log_likelihood_over_sigma_) == pytest.approx(
+        np.array(models[0].log_likelihood_over_sigma_), rel=1e-5
+    )
+    assert models[1].coef_ == pytest.approx(models[0].coef_, rel=1e-5)
+    assert models[1].feature_posteriors_ == pytest.approx(models[0].feature_posteriors_)
+
+
+@pytest.mark.parametrize("dtype", [np.int64, np.float16])
+def test_error_unsupported_dtype(seed, dtype):
+    """
+    Test error case of method `fit` when dtype is neither float32 nor float64.
+    """
+    X = np.random.randn(10, 2)
+    x_scaler = StandardScaler(n_dim=2)
+    x_scaler.fit(X)
+    X = x_scaler.transform(X)
+    y = np.random.randn(10)
+    y -= y.mean()
+
+    reg = ExhaustiveLinearRegression(
+        sigma_noise_points=inverse(np.logspace(-2, 0, 5)),
+        sigma_coef_points=inverse(np.logspace(-1, 1, 5)),
+        dtype=dtype,
+    )
+    with pytest.raises(ValueError, match="dtype should be either"):
+        reg.fit(X, y, verbose=False)
+
+
+def test_error_negative_prune_threshold(seed):
+    """
+    Test error case of method `fit` when prune_threshold is negative.
+    """
+    X = np.random.randn(10, 2)
+    x_scaler = StandardScaler(n_dim=2)
+    x_scaler.fit(X)
+    X = x_scaler.transform(X)
+    y = np.random.randn(10)
+    y -= y.mean()
+
+    reg = ExhaustiveLinearRegression(
+        sigma_noise_points=inverse(np.logspace(-2, 0, 5)),
+        sigma_coef_points=inverse(np.logspace(-1, 1, 5)),
+        prune_threshold=-1.0,
+    )
+    with pytest.raises(ValueError, match="prune_threshold should be non-negative"):
+        reg.fit(X, y, verbose=False)
+
+
+def test_error_predict_by_pruned_model(seed, monkeypatch):
+    """
+    Test error case of method `predict` with mode 'select'
+    when the selected model is pruned in fit.
+    """
+    n_data, n_features = 60, 4
+    X = np.random.randn(n_data, n_features)
+    y = np.dot(X[:, [0, 1]], [1, -0.7]) + np.random.randn(n_data) * 0.1
+
+    x_scaler = StandardScaler(n_dim=2)
+    y_scaler = StandardScaler(n_dim=1, scaling=False)
+    x_scaler.fit(X)
+    y_scaler.fit(y)
+    X = x_scaler.transform(X)
+    y = y_scaler.transform(y)
+
+    reg = ExhaustiveLinearRegression(
+        sigma_noise_points=inverse(np.logspace(-2, 0, 5)),
+        sigma_coef_points=inverse(np.logspace(-1, 1, 5)),
+        prune_threshold=0.0,
+    )
+    reg.fit(X, y, verbose=False)
+    assert reg.predict(X, mode="select").shape == (n_data,)
+
+    # Selection of a pruned model is emulated
+    pruned_index = int(np.flatnonzero(np.isneginf(reg.log_likelihoods_))[0])
+    pruned_indicator = reg.indicators_list[pruned_index]
+    monkeypatch.setattr(reg, "select_variables", lambda threshold: pruned_indicator)
+    with pytest.raises(ValueError, match="was pruned in fit"):
+        reg.predict(X, mode="select")
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_calculate_log_marginal_likelihood_over_sigma(seed, monkeypatch, dtype):
+    """
+    Test method `_calculate_log_marginal_likelihood_over_sigma`,
+    which reduces models in blocks, against `scipy.special.logsumexp`.
+    """
+    n_models, n_sigma_noise, n_sigma_coef = 50, 3, 4
+    log_priors = np.random.randn(n_models)
+    log_likelihoods_over_sigma = (
+        np.random.randn(n_models, n_sigma_noise, n_sigma_coef) * 100
+    ).astype(dtype)
+    # Pruned models and a grid point where all models have -inf
+    log_likelihoods_over_sigma[::3] = -np.inf
+    log_likelihoods_over_sigma[:, 0, 0] = -np.inf
+
+    # Blocks contain 5 models each
+    monkeypatch.setattr(
+        exhaustive_search, "MAX_REDUCTION_ELEMENTS", 5 * n_sigma_noise * n_sigma_coef
+    )
+    reg = ExhaustiveLinearRegression(sigma_noise_points=[], sigma_coef_points=[])
+    result = reg._calculate_log_marginal_likelihood_over_sigma(
+        log_priors=log_priors, log_likelihoods_over_sigma=log_likelihoods_over_sigma
+    )
+    expect = logsumexp(
+        log_likelihoods_over_sigma.astype(np.float64)
+        + log_priors[:, np.newaxis, np.newaxis],
+        axis=0,
+    )
+    assert np.array(result) == pytest.approx(expect)
@@ -1,11 +1,13 @@
 import numpy as np
 import pytest
+from scipy.special import logsumexp
 
 from exhbma import (
     integrate_log_values_in_line,
     integrate_log_values_in_square,
     validate_list_dimension,
 )
+from exhbma.integrate import _logsumexp
 
 
 def test_integrate_log_values_in_square():
@@ -239,3 +241,56 @@ def test_validate_list_dimension_dimension():
 
     with pytest.raises(ValueError, match="matrix must be 2-dim list, received 1-dim"):
         validate_list_dimension(x=[0, 0, 0], dim=2, name="matrix")
+
+
+@pytest.mark.parametrize("axis", [None, 0, 1])
+def test_logsumexp(axis):
+    """
+    Test function `_logsumexp` against `scipy.special.logsumexp`.
+    """
+    np.random.seed(0)
+    a = np.random.randn(5, 4) * 100
+    b = np.random.randn(5, 4)
+
+    assert _logsumexp(a, axis=axis) == pytest.approx(logsumexp(a, axis=axis))
+
+    result = _logsumexp(a, axis=axis, b=b, return_sign=True)
+    expect = logsumexp(a, axis=axis, b=b, return_sign=True)
+    assert result[0] == pytest.approx(expect[0])
+    assert np.all(result[1] == expect[1])
+
+    # Values with zero weight should be ignored even if they are the largest
+    zero_index = ([0, 2, 4], [0, 1, 3])
+    b[zero_index] = 0
+    a[zero_index] = 1000
+    result = _logsumexp(a, axis=axis, b=b, return_sign=True)
+    expect = logsumexp(a, axis=axis, b=b, return_sign=True)
+    assert result[0] == pytest.approx(expect[0])
+    assert np.all(result[1] == expect[1])
+
+
+def test_integrate_log_values_with_zero_weights():
+    """
+    Values with zero weight should not affect the results
+    even if they are much larger than the others.
+    """
+    result = integrate_log_values_in_line(
+        log_values=[0.0, -800.0, -800.0], x1=[0.0, 1.0, 2.0], weights=[0.0, 1.0, 1.0]
+    )
+    assert result == pytest.approx(-800 + np.log(1.5))
+
+    result = integrate_log_values_in_square(
+        log_values=[[0.0, -800.0], [-800.0, -800.0]],
+        x1=[0.0, 1.0],
+        x2=[0.0, 1.0],
+        weights=[[0.0, 1.0], [1.0, 1.0]],
+    )
+    assert result == pytest.approx(-800 + np.log(0.75))
+
+
+def test_logsumexp_all_negative_infinity():
+    """
+    Test function `_logsumexp` when all values are -inf.
+    """
+    a = np.full(3, -np.inf)
+    assert _logsumexp(a) == -np.inf
@@ -370,3 +370,37 @@ def test_marginal_linear_regression(seed):
 
     pred_y = y_scaler.restore(reg.predict(x_scaler.transform(test_X)))
     assert calculate_rmse(test_y, pred_y) <= sigma_noise
+
+
+@pytest.mark.parametrize("n_data, n_features", [(50, 10), (20, 30)])
+def test_fit_grid(seed, n_data: int, n_features: int):
+    """
+    Test method `fit_grid` by comparing against `fit` on each grid point.
+    """
+    sigma_noise_arr = np.logspace(-2, 0, 4)
+    sigma_coef_arr = np.logspace(-1, 1, 3)
+
+    X = np.random.randn(n_data, n_features)
+    w = np.random.randn(n_features)
+    y = np.dot(X, w) + np.random.randn(n_data) * 0.1
+
+    x_scaler = StandardScaler(n_dim=2)
+    y_scaler = StandardScaler(n_dim=1, scaling=False)
+    x_scaler.fit(X)
+    y_scaler.fit(y)
+    X = x_scaler.transform(X)
+    y = y_scaler.transform(y)
+
+    log_likelihood_over_sigma, coef = LinearRegression.fit_grid(
+        X=X, y=y, sigma_noise_arr=sigma_noise_arr, sigma_coef_arr=sigma_coef_arr
+    )
+    assert log_likelihood_over_sigma.shape == (4, 3)
+    assert coef.shape == (4, 3, n_features)
+
+    for i, sn in enumerate(sigma_noise_arr):
+        for j, sc in enumerate(sigma_coef_arr):
+            lr = LinearRegression(sigma_noise=sn, sigma_coef=sc)
+            lr.fit(X=X, y=y)
+            assert log_likelihood_over_sigma[i, j] == pytest.approx(lr.log_likelihood_)
+            # Tiny elements are affected by round-off in ill-conditioned cases
+            assert coef[i, j] == pytest.approx(lr.coef_, abs=1e-6)